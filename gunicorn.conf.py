@@ -0,0 +1,12 @@
+# gunicorn settings for the web GUI: gunicorn -c gunicorn.conf.py wsgi:app
+import os
+
+# Session state (app_state), the progress flusher and the JSON caches live in the
+# worker's memory, so run a single worker and scale with threads instead.
+workers = 1
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+keepalive = 5
+
+# Render and similar hosts provide PORT
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
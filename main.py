@@ -1,20 +1,31 @@
 # quiz_plus.py
 # Easy Anki (Exam + SRS + Filters + CSV/JSON loader)
 import argparse
+import atexit
 import csv
+import heapq
 import json
 import math
 import os
+import queue
 import random
 import re
 import sys
-from dataclasses import dataclass, field, asdict
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 
+try:
+    import orjson  # optional: 2-3x faster JSON encode/decode
+except ImportError:
+    orjson = None
+
 # --------------------------- Data Models ---------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Question:
     id: str
     prompt: str
@@ -27,11 +38,19 @@ class Question:
     def canonical(self):
         self.answer = self.answer.strip().upper()
         self.options = [o.strip() for o in self.options]
-        self.tags = [t.strip().lower() for t in self.tags if t.strip()]
+        # chapters/tags come from a small vocabulary: intern them so duplicates share one object
+        self.tags = [sys.intern(t.strip().lower()) for t in self.tags if t.strip()]
         if self.chapter:
-            self.chapter = self.chapter.strip()
+            self.chapter = sys.intern(self.chapter.strip())
+
+    def to_dict(self) -> Dict[str, Any]:
+        # shallow field copy (slotted instances have no __dict__)
+        return {f.name: getattr(self, f.name) for f in fields(self)}
 
-@dataclass
+# Lower box → higher sampling weight
+BOX_WEIGHTS = {1: 1.0, 2: 0.6, 3: 0.35, 4: 0.2, 5: 0.1}
+
+@dataclass(slots=True)
 class CardState:
     # Leitner-style SRS state
     box: int = 1                 # 1..5
@@ -39,35 +58,68 @@ class CardState:
     incorrect_count: int = 0
     last_seen: Optional[str] = None  # ISO timestamp
     due: Optional[str] = None        # ISO timestamp
+    # `due` parsed once to an epoch float (not persisted); 0.0 means never scheduled
+    _due_ts: float = field(default=0.0, init=False, repr=False, compare=False)
+    # box weight for sampling (not persisted); only changes when the box does
+    _weight: float = field(default=1.0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._weight = BOX_WEIGHTS.get(self.box, 1.0)
+        if self.due:
+            try:
+                self._due_ts = datetime.fromisoformat(self.due).timestamp()
+            except (TypeError, ValueError):
+                self._due_ts = 0.0
 
-    def promote(self):
+    def to_dict(self) -> Dict[str, Any]:
+        # persisted fields only; derived caches stay in memory. Built directly rather
+        # than via asdict(), which deep-copies every field of every card on each save
+        return {"box": self.box, "correct_streak": self.correct_streak,
+                "incorrect_count": self.incorrect_count, "last_seen": self.last_seen, "due": self.due}
+
+    def promote(self, now: Optional[datetime] = None):
         self.correct_streak += 1
         self.box = min(5, self.box + 1)
-        self.schedule()
+        self.schedule(now=now)
 
-    def demote(self):
+    def demote(self, now: Optional[datetime] = None):
         self.correct_streak = 0
         self.box = 1
         self.incorrect_count += 1
-        self.schedule(reset=True)
+        self.schedule(reset=True, now=now)
 
-    def schedule(self, reset: bool=False):
+    def schedule(self, reset: bool=False, now: Optional[datetime] = None):
         # very simple intervals by box: 1→0d (always due), 2→1d, 3→3d, 4→7d, 5→14d
+        # `now` lets callers updating many cards at once share one clock read
         intervals = {1:0, 2:1, 3:3, 4:7, 5:14}
         days = 0 if reset else intervals.get(self.box, 0)
-        due_date = datetime.utcnow() + timedelta(days=days)
-        self.last_seen = datetime.utcnow().isoformat(timespec="seconds")
+        if now is None:
+            now = datetime.utcnow()
+        due_date = now + timedelta(days=days)
+        self.last_seen = now.isoformat(timespec="seconds")
         self.due = due_date.isoformat(timespec="seconds")
+        self._due_ts = due_date.replace(microsecond=0).timestamp()
+        self._weight = BOX_WEIGHTS.get(self.box, 1.0)
 
 # --------------------------- Built-in Pool (fallback) ---------------------------
 # 40 default questions (same content as earlier reply), trimmed for brevity here; keep full set:
-BUILTIN: List[Question] = []
-
-def add_builtin():
+# Built lazily by builtin() so importing this module (e.g. from webgui) stays cheap.
+_BUILTIN: Optional[List[Question]] = None
+
+def builtin() -> List[Question]:
+    """Return the built-in pool, constructing it on first use."""
+    global _BUILTIN
+    if _BUILTIN is None:
+        pool: List[Question] = []
+        add_builtin(pool)
+        _BUILTIN = pool
+    return _BUILTIN
+
+def add_builtin(pool: List[Question]):
     def Q(i, prompt, opts, ans, exp, ch=None, tags=""):
-        BUILTIN.append(Question(
+        pool.append(Question(
             id=str(i), prompt=prompt, options=opts, answer=ans, explanation=exp,
-            chapter=ch, tags=[t.strip() for t in tags.split(",") if t.strip()]
+            chapter=ch, tags=[sys.intern(t.strip()) for t in tags.split(",") if t.strip()]
         ))
     A,B,C,D="A","B","C","D"
     # --- Add all 40 questions from previous answer (omitted comments) ---
@@ -207,68 +259,235 @@ def add_builtin():
          "Cytosolic H+ gradient drives mitochondrial ATP synthase","No H+ gradient is required"],
         B,"Protons accumulate in thylakoid lumen; ATP made facing stroma.","10","photophosphorylation")
 
-add_builtin()
+# --------------------------- IO: JSON helpers ---------------------------
+
+def json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj: Any, indent: bool = True) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except orjson.JSONEncodeError:
+            # orjson rejects what stdlib json accepts (ints past 64 bits, non-str
+            # keys); fall through rather than lose the write
+            pass
+    if indent:
+        return json.dumps(obj, indent=2).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+def read_json(path: str) -> Any:
+    with open(path, "rb") as f:
+        return json_loads(f.read())
+
+def stat_key(path: Optional[str]) -> Optional[tuple]:
+    """(mtime_ns, size) of a file, or None if it can't be stat'ed. This is the validity
+    key for every cache of parsed file contents (see StatCache, write_json)."""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+class StatCache:
+    """Bounded, thread-safe LRU of values parsed from files. An entry is served only
+    while the caller's current stat_key for the file matches the one it was stored with."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, key: Optional[tuple]) -> Any:
+        if key is None:
+            return None
+        with self._lock:
+            hit = self._data.get(path)
+            if hit is None or hit[0] != key:
+                return None
+            self._data.move_to_end(path)
+            return hit[1]
+
+    def put(self, path: str, key: Optional[tuple], value: Any):
+        if key is None:
+            return
+        with self._lock:
+            self._data[path] = (key, value)
+            self._data.move_to_end(path)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, path: str):
+        with self._lock:
+            self._data.pop(path, None)
+
+def _fsync_dir(path: str):
+    # persist the rename itself; not supported on every platform
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def write_json(path: str, obj: Any, indent: bool = True, fsync: bool = False) -> tuple:
+    # serialize first, then write a sibling temp file and rename it over the target,
+    # so readers never see a truncated file and a failed dump leaves the old one intact.
+    # fsync=True also makes the new contents durable before the rename.
+    # Returns the written file's (mtime_ns, size), taken from the temp file itself so a
+    # concurrent writer's rename can't be mistaken for ours (rename keeps both).
+    data = json_dumps(obj, indent)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        os.replace(tmp, path)
+        if fsync:
+            _fsync_dir(os.path.dirname(path) or ".")
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return (st.st_mtime_ns, st.st_size)
 
 # --------------------------- IO: CSV/JSON Loader ---------------------------
 
-def load_questions(path: Optional[str]) -> List[Question]:
-    if path is None:
-        return BUILTIN[:]
-    if not os.path.exists(path):
-        print(f"[WARN] Source not found: {path}. Using built-in pool.")
-        return BUILTIN[:]
-    ext = os.path.splitext(path)[1].lower()
+# Parsed banks are cached next to the source as <source>.qcache (JSON, keyed by the
+# source's mtime and size) so unchanged banks skip CSV/JSON parsing on later starts.
+QCACHE_SUFFIX = ".qcache"
+# bump whenever parsing or Question.canonical() changes, so stale rows are re-parsed
+QCACHE_VERSION = 1
+
+def _read_qcache(path: str, st: os.stat_result) -> Optional[List[Question]]:
     try:
-        if ext == ".json":
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            qs = []
-            for row in data:
+        cached = read_json(path + QCACHE_SUFFIX)
+        if (cached.get("v") != QCACHE_VERSION or cached["mtime_ns"] != st.st_mtime_ns
+                or cached["size"] != st.st_size):
+            return None
+        # rows are already canonical; only re-intern the shared vocabulary
+        return [
+            Question(qid, prompt, options, answer, explanation,
+                     sys.intern(chapter) if chapter else None, [sys.intern(t) for t in tags])
+            for qid, prompt, options, answer, explanation, chapter, tags in cached["rows"]
+        ]
+    except Exception:
+        return None
+
+def _write_qcache(path: str, st: os.stat_result, qs: List[Question]):
+    rows = [[q.id, q.prompt, q.options, q.answer, q.explanation, q.chapter, q.tags] for q in qs]
+    try:
+        # atomic: concurrent first loads of the same bank can't interleave their writes
+        write_json(path + QCACHE_SUFFIX,
+                   {"v": QCACHE_VERSION, "mtime_ns": st.st_mtime_ns, "size": st.st_size, "rows": rows},
+                   indent=False)
+    except OSError:
+        pass  # cache is best-effort (e.g. read-only source directory)
+
+def _parse_questions(path: str) -> List[Question]:
+    ext = os.path.splitext(path)[1].lower()
+    qs = []
+    if ext == ".json":
+        for row in read_json(path):
+            q = Question(
+                id=str(row.get("id", row.get("ID", ""))),
+                prompt=row["prompt"],
+                options=[row["A"], row["B"], row["C"], row["D"]],
+                answer=row["answer"],
+                explanation=row.get("explanation", ""),
+                chapter=str(row.get("chapter")) if row.get("chapter") is not None else None,
+                tags=row.get("tags", []),
+            )
+            q.canonical()
+            qs.append(q)
+    else:
+        # CSV columns: id,prompt,A,B,C,D,answer,explanation,chapter,tags
+        # csv.reader + header positions: no per-row dict like DictReader builds
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                return qs
+            col = {name: i for i, name in enumerate(header)}
+            # required columns: a missing one raises KeyError (parse failure)
+            i_prompt, i_answer = col["prompt"], col["answer"]
+            i_opts = [col["A"], col["B"], col["C"], col["D"]]
+            # optional columns: -1 when absent
+            i_id, i_exp, i_ch, i_tags = (col.get(c, -1) for c in ("id", "explanation", "chapter", "tags"))
+            width = len(header)
+            for row in reader:
+                if not row:
+                    continue  # blank line
+                if len(row) < width:
+                    row += [""] * (width - len(row))
+                tags = []
+                if i_tags >= 0 and row[i_tags]:
+                    # ';' or ',' separated; str.replace + split beats re.split per row
+                    tags = [t.strip() for t in row[i_tags].replace(";", ",").split(",") if t.strip()]
                 q = Question(
-                    id=str(row.get("id", row.get("ID", ""))),
-                    prompt=row["prompt"],
-                    options=[row["A"], row["B"], row["C"], row["D"]],
-                    answer=row["answer"],
-                    explanation=row.get("explanation", ""),
-                    chapter=str(row.get("chapter")) if row.get("chapter") is not None else None,
-                    tags=row.get("tags", []),
+                    id=row[i_id] if i_id >= 0 else "",
+                    prompt=row[i_prompt],
+                    options=[row[i] for i in i_opts],
+                    answer=row[i_answer],
+                    explanation=row[i_exp] if i_exp >= 0 else "",
+                    chapter=(row[i_ch] or None) if i_ch >= 0 else None,
+                    tags=tags
                 )
                 q.canonical()
                 qs.append(q)
+    return qs
+
+def load_questions(path: Optional[str], cache: bool = False) -> List[Question]:
+    # cache=True reads/writes the <path>.qcache sidecar; only pass it for trusted
+    # locations, since it creates a file next to the source
+    if path is None:
+        return builtin()[:]
+    try:
+        st = os.stat(path)
+    except OSError:
+        print(f"[WARN] Source not found: {path}. Using built-in pool.")
+        return builtin()[:]
+    if cache:
+        qs = _read_qcache(path, st)
+        if qs is not None:
             return qs
-        else:
-            # CSV columns: id,prompt,A,B,C,D,answer,explanation,chapter,tags
-            qs = []
-            with open(path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    tags = []
-                    if row.get("tags"):
-                        tags = [t.strip() for t in re.split(r"[;,]", row["tags"]) if t.strip()]
-                    q = Question(
-                        id=str(row.get("id", "")),
-                        prompt=row["prompt"],
-                        options=[row["A"], row["B"], row["C"], row["D"]],
-                        answer=row["answer"],
-                        explanation=row.get("explanation", ""),
-                        chapter=row.get("chapter") or None,
-                        tags=tags
-                    )
-                    q.canonical()
-                    qs.append(q)
-            return qs
+    try:
+        qs = _parse_questions(path)
     except Exception as e:
         print(f"[ERROR] Failed to parse {path}: {e}")
         print("[INFO] Using built-in pool.")
-        return BUILTIN[:]
+        return builtin()[:]
+    if cache:
+        _write_qcache(path, st, qs)
+    return qs
 
 # --------------------------- Progress Persistence ---------------------------
 
+# Last parsed/written contents per progress file, so an unchanged file (e.g. the one
+# save_progress just wrote) is not parsed again.
+_progress_raw = StatCache(64)
+
 def load_progress(fp: str) -> Dict[str, CardState]:
-    if not os.path.exists(fp):
+    key = stat_key(fp)
+    if key is None:
         return {}
     try:
-        raw = json.load(open(fp, "r", encoding="utf-8"))
+        raw = _progress_raw.get(fp, key)
+        if raw is None:
+            raw = read_json(fp)
+            _progress_raw.put(fp, key, raw)
+        # fresh CardState objects every call; the cached raw dicts are never handed out
         out: Dict[str, CardState] = {}
         for k, v in raw.items():
             st = CardState(**v)
@@ -278,101 +497,143 @@ def load_progress(fp: str) -> Dict[str, CardState]:
         return {}
 
 def save_progress(fp: str, prog: Dict[str, CardState]):
-    serial = {k: asdict(v) for k, v in prog.items()}
-    with open(fp, "w", encoding="utf-8") as f:
-        json.dump(serial, f, indent=2)
+    raw = {k: v.to_dict() for k, v in prog.items()}
+    _progress_raw.put(fp, write_json(fp, raw, fsync=True), raw)
 
 # --------------------------- Helpers ---------------------------
 
+# utc_now_iso() is hit on every answer and session end; format each second only once
+_iso_last = (None, "")
+
+def utc_now_iso() -> str:
+    """Current UTC time as an ISO string at second precision (as used on disk)."""
+    global _iso_last
+    sec = int(time.time())
+    last = _iso_last
+    if last[0] == sec:
+        return last[1]
+    s = datetime.utcfromtimestamp(sec).isoformat(timespec="seconds")
+    _iso_last = (sec, s)
+    return s
+
+# a numeric range "9-12" (spaces allowed around the dash) or any single token
+_CHAPTER_RE = re.compile(r"(\d+)\s*-\s*(\d+)|([^,\s]+)")
+
 def parse_chapter_filter(expr: Optional[str]) -> Optional[set]:
     if not expr:
         return None
     # e.g., "3,4,9-12"
     sel = set()
-    for token in re.split(r"[,\s]+", expr.strip()):
-        if not token: continue
-        if "-" in token:
-            a,b = token.split("-",1)
-            try:
-                a=int(a); b=int(b)
-                for x in range(min(a,b), max(a,b)+1): sel.add(str(x))
-            except: pass
-        else:
-            sel.add(str(token))
+    for m in _CHAPTER_RE.finditer(expr):
+        a, b, token = m.groups()
+        if token is None:
+            a, b = int(a), int(b)
+            sel.update(sys.intern(str(x)) for x in range(min(a, b), max(a, b) + 1))
+        elif "-" not in token:
+            sel.add(sys.intern(token))
     return sel or None
 
 def filter_questions(qs: List[Question], chapters: Optional[set], tags: Optional[List[str]]) -> List[Question]:
-    tags = [t.strip().lower() for t in (tags or []) if t.strip()]
-    out = []
-    for q in qs:
-        if chapters and (not q.chapter or q.chapter not in chapters):
-            continue
-        if tags and not (set(tags) & set(q.tags)):
-            continue
-        out.append(q)
-    return out
-
-def srs_weight(qid: str, prog: Dict[str, CardState]) -> float:
-    # Lower box → higher weight; overdue → bonus
-    st = prog.get(qid, CardState())
-    base = {1: 1.0, 2: 0.6, 3: 0.35, 4: 0.2, 5: 0.1}[st.box]
-    overdue_bonus = 1.0
-    if st.due:
-        try:
-            due = datetime.fromisoformat(st.due)
-            if datetime.utcnow() >= due:
-                delta_days = (datetime.utcnow() - due).days + 1
-                overdue_bonus = 1.0 + min(1.0, 0.2 * delta_days)  # up to 2x
-        except Exception:
-            pass
-    return base * overdue_bonus
+    # build the tag set once; isdisjoint() walks q.tags without allocating a set per question
+    wanted = frozenset(t.strip().lower() for t in (tags or []) if t.strip())
+    return [
+        q for q in qs
+        if (not chapters or (q.chapter and q.chapter in chapters))
+        and (not wanted or not wanted.isdisjoint(q.tags))
+    ]
+
+def overdue_bonus(due_ts: float, now_ts: float) -> float:
+    # 1.0 until due, then +0.2 per started overdue day, up to 2x
+    if not due_ts or now_ts < due_ts:
+        return 1.0
+    return 1.0 + min(1.0, 0.2 * (int((now_ts - due_ts) // 86400) + 1))
+
+def srs_weight(st: Optional[CardState], now_ts: float) -> float:
+    # Lower box → higher weight; overdue → bonus. Unseen cards weigh like box 1.
+    if st is None:
+        return 1.0
+    return st._weight * overdue_bonus(st._due_ts, now_ts)
 
 def choose_exam_set(qs: List[Question], n: int, prog: Dict[str, CardState]) -> List[Question]:
-    # sample with SRS weights; fall back to uniform if small
+    # sample with SRS weights, without replacement, in a single pass:
+    # each card gets the key log(u)/w and the n largest keys win (Efraimidis–Spirakis)
     if not qs:
         return []
-    weights = [srs_weight(q.id, prog) for q in qs]
-    total = sum(weights)
-    if total == 0:
-        random.shuffle(qs)
-        return qs[:n]
-    # weighted sampling without replacement
-    chosen = []
-    pool = list(qs)
-    w = list(weights)
-    for _ in range(min(n, len(pool))):
-        total = sum(w)
-        r = random.random() * total
-        s = 0.0
-        idx = 0
-        for i, wi in enumerate(w):
-            s += wi
-            if s >= r:
-                idx = i
-                break
-        chosen.append(pool.pop(idx))
-        w.pop(idx)
-    return chosen
+    rnd = random.random
+    now_ts = datetime.utcnow().timestamp()
+
+    def key(q: Question) -> float:
+        w = srs_weight(prog.get(q.id), now_ts)
+        return math.log(1.0 - rnd()) / w if w > 0 else -math.inf
+
+    return heapq.nlargest(min(n, len(qs)), qs, key=key)
+
+class DueQueue:
+    """Practice-mode scheduler.
+
+    Cards that are due are sampled by SRS weight; the rest wait in a min-heap keyed
+    by due time and move over as they come due, so each batch only touches the
+    due set instead of re-weighting the whole pool.
+    """
+
+    def __init__(self, pool: List[Question], prog: Dict[str, CardState]):
+        self.prog = prog
+        self.pos = {id(q): i for i, q in enumerate(pool)}  # heap tie-breaker
+        self.due: Dict[int, Question] = {}                  # id(q) -> q
+        self.future: List[tuple] = []                       # (due_ts, pos, q)
+        now_ts = datetime.utcnow().timestamp()
+        for q in pool:
+            self._place(q, now_ts)
+
+    def _place(self, q: Question, now_ts: float):
+        st = self.prog.get(q.id)
+        due_ts = st._due_ts if st is not None else 0.0
+        if due_ts <= now_ts:
+            self.due[id(q)] = q
+        else:
+            heapq.heappush(self.future, (due_ts, self.pos[id(q)], q))
+
+    def next_batch(self, k: int) -> List[Question]:
+        now_ts = datetime.utcnow().timestamp()
+        while self.future and self.future[0][0] <= now_ts:
+            q = heapq.heappop(self.future)[2]
+            self.due[id(q)] = q
+        chosen = choose_exam_set(list(self.due.values()), k, self.prog)
+        # not enough due: top up with the cards that come due soonest
+        while len(chosen) < k and self.future:
+            chosen.append(heapq.heappop(self.future)[2])
+        for q in chosen:
+            self.due.pop(id(q), None)
+        return chosen
+
+    def reviewed(self, qs: List[Question]):
+        # re-file answered cards by their new due time
+        now_ts = datetime.utcnow().timestamp()
+        for q in qs:
+            self._place(q, now_ts)
 
 def print_rule():
     print("\nEnter A/B/C/D (or 'q' to quit). Immediate feedback shown.\n")
 
+# option labels built once instead of chr(ord('A')+i) per option per question
+LETTERS = ("A", "B", "C", "D")
+OPTION_PREFIXES = tuple(f"  {letter}) " for letter in LETTERS)
+
 def ask(q: Question) -> bool:
-    print("\n" + "-"*90)
-    print(f"[{q.id}] {q.prompt}")
-    for i, opt in enumerate(q.options):
-        print(f"  {chr(ord('A')+i)}) {opt}")
+    # one write per block of output instead of a print() per line
+    sys.stdout.write(
+        "\n" + "-"*90 + f"\n[{q.id}] {q.prompt}\n"
+        + "".join(prefix + opt + "\n" for prefix, opt in zip(OPTION_PREFIXES, q.options))
+    )
+    sys.stdout.flush()
     while True:
         choice = input("Your answer (A/B/C/D or q): ").strip().upper()
         if choice == "Q":
             raise SystemExit("\nExiting. Progress saved.")
         if choice in ("A","B","C","D"):
             ok = (choice == q.answer)
-            if ok:
-                print("✅ Correct.", end=" ")
-            else:
-                print(f"❌ Incorrect. Correct: {q.answer}", end=" ")
-            print(f"\nℹ️  {q.explanation}")
+            verdict = "✅ Correct." if ok else f"❌ Incorrect. Correct: {q.answer}"
+            sys.stdout.write(f"{verdict} \nℹ️  {q.explanation}\n")
             return ok
         print("Please enter A, B, C, D or q.")
 
@@ -384,13 +645,15 @@ def run_round(qs: List[Question], title: str, prog: Dict[str, CardState]) -> Lis
     wrong: List[Question] = []
     for q in qs:
         ok = ask(q)
-        st = prog.get(q.id, CardState())
+        st = prog.get(q.id)
+        if st is None:
+            # only build a fresh state for cards seen for the first time
+            st = prog[q.id] = CardState()
         if ok:
             st.promote()
         else:
             st.demote()
             wrong.append(q)
-        prog[q.id] = st
     print(f"\nRound complete: {len(qs)-len(wrong)}/{len(qs)} correct.")
     return wrong
 
@@ -410,17 +673,80 @@ def build_argparser():
     p.add_argument("--log", default="session_log.jsonl", help="Append-only session log.")
     return p
 
+# Background daemon threads by name, started on first use
+_daemons: Dict[str, threading.Thread] = {}
+_daemons_lock = threading.Lock()
+
+def _ensure_daemon(name: str, target) -> threading.Thread:
+    """Start the named daemon thread running `target` unless it is already alive."""
+    t = _daemons.get(name)
+    if t is None or not t.is_alive():
+        with _daemons_lock:
+            # (re)start lazily: a forked worker does not inherit the parent's thread
+            t = _daemons.get(name)
+            if t is None or not t.is_alive():
+                t = _daemons[name] = threading.Thread(target=target, name=name, daemon=True)
+                t.start()
+    return t
+
+# Session log lines are appended by a single background writer so callers never wait on disk.
+_log_q: "queue.Queue[tuple]" = queue.Queue()
+LOG_BATCH = 64
+# after the first queued line, wait this long for more so sparse events share a write
+LOG_FLUSH_INTERVAL = 1.0
+
+def _write_log_batch(batch: List[tuple]):
+    # one open + one write per log file per batch
+    by_fp: Dict[str, List[bytes]] = {}
+    for fp, line in batch:
+        by_fp.setdefault(fp, []).append(line)
+    for fp, lines in by_fp.items():
+        try:
+            with open(fp, "ab", buffering=1 << 16) as f:
+                f.write(b"".join(lines))
+        except OSError as e:
+            print(f"[WARN] Could not write log {fp}: {e}")
+
+def _log_writer():
+    while True:
+        items = [_log_q.get()]
+        deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+        # None is flush_log()'s "write now" marker
+        while items[-1] is not None and len(items) < LOG_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(_log_q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        batch = [item for item in items if item is not None]
+        if batch:
+            _write_log_batch(batch)
+        for _ in items:
+            _log_q.task_done()
+
+def flush_log():
+    """Block until every queued log line has been written."""
+    t = _daemons.get("log-writer")
+    if t is not None and t.is_alive():
+        _log_q.put(None)
+        _log_q.join()
+
+atexit.register(flush_log)
+
 def log_event(fp: str, data: Dict[str, Any]):
-    data["_ts"] = datetime.utcnow().isoformat(timespec="seconds")
-    with open(fp, "a", encoding="utf-8") as f:
-        f.write(json.dumps(data) + "\n")
+    data["_ts"] = utc_now_iso()
+    # encode now so later mutation of `data` can't change what gets logged
+    _log_q.put((fp, json_dumps(data, indent=False) + b"\n"))
+    _ensure_daemon("log-writer", _log_writer)
 
 def main():
     args = build_argparser().parse_args()
 
-    all_qs = load_questions(args.source)
+    all_qs = load_questions(args.source, cache=True)
     chapters = parse_chapter_filter(args.chapters)
-    tags = re.split(r"[,\s]+", args.tags.strip()) if args.tags else None
+    tags = args.tags.replace(",", " ").split() if args.tags else None
     pool = filter_questions(all_qs, chapters, tags)
 
     if not pool:
@@ -441,11 +767,13 @@ def main():
         print("\n🎉 All questions mastered this session.")
     else:
         # Practice mode: continuous SRS batches
+        due_queue = DueQueue(pool, prog)
         batch = 1
         while True:
             # Pick due/weighted questions
-            selection = choose_exam_set(pool, args.num, prog)
+            selection = due_queue.next_batch(args.num)
             wrong = run_round(selection, f"Practice Batch {batch}", prog)
+            due_queue.reviewed(selection)
             batch += 1
             cont = input("\nPress Enter for another batch, or 'q' to quit: ").strip().lower()
             if cont == 'q':
@@ -1,17 +1,93 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Flask, render_template, request, redirect, url_for, session, flash, g, has_request_context
+import atexit
+import heapq
 import uuid
 import os
+import shutil
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 from werkzeug.security import generate_password_hash, check_password_hash
-from main import load_questions, load_progress, save_progress, choose_exam_set, filter_questions, parse_chapter_filter, CardState, BUILTIN, log_event
+from main import load_questions, load_progress, save_progress, choose_exam_set, filter_questions, parse_chapter_filter, CardState, builtin, log_event, QCACHE_SUFFIX, read_json, write_json, LETTERS, utc_now_iso, stat_key, StatCache, _ensure_daemon
 from datetime import datetime, date, timedelta
 from typing import Tuple
 
 app = Flask(__name__)
 # For production, read secret key from environment. Fallback to random for dev.
 app.secret_key = os.environ.get('SECRET_KEY') or os.urandom(24)
-
-# In-memory server-side storage for session state to avoid large cookies
-app_state = {}
+# Let browsers reuse /static assets instead of revalidating them on every page. Their
+# URLs are not versioned, so keep this modest (STATIC_MAX_AGE seconds, default 12h).
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = int(os.environ.get('STATIC_MAX_AGE', 12 * 3600))
+
+# In-memory server-side storage for session state to avoid large cookies.
+# Bounded so abandoned sessions (no /end) don't accumulate forever.
+APP_STATE_MAX = 1024
+APP_STATE_TTL = 3600.0
+
+
+class SessionStore:
+    """Dict-like LRU with idle expiry for per-session state."""
+
+    def __init__(self, maxsize=APP_STATE_MAX, ttl=APP_STATE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # sid -> (last_used, state)
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        # entries are kept in last-used order, so stale ones sit at the front
+        while self._data:
+            sid, (ts, _) = next(iter(self._data.items()))
+            if now - ts < self.ttl:
+                break
+            del self._data[sid]
+
+    def __setitem__(self, sid, state):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._data[sid] = (now, state)
+            self._data.move_to_end(sid)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, sid, default=None):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            hit = self._data.get(sid)
+            if hit is None:
+                return default
+            self._data[sid] = (now, hit[1])
+            self._data.move_to_end(sid)
+            return hit[1]
+
+    def __getitem__(self, sid):
+        state = self.get(sid)
+        if state is None:
+            raise KeyError(sid)
+        return state
+
+    def __contains__(self, sid):
+        return self.get(sid) is not None
+
+    def pop(self, sid, *default):
+        with self._lock:
+            hit = self._data.pop(sid, None)
+        if hit is None:
+            if default:
+                return default[0]
+            raise KeyError(sid)
+        return hit[1]
+
+    def __len__(self):
+        return len(self._data)
+
+
+app_state = SessionStore()
 
 PROGRESS_FILE = "course_progress.json"
 LOG_FILE = "session_log.jsonl"
@@ -22,33 +98,43 @@ USERS_FILE = os.path.join(DATA_DIR, 'users.json')
 def ensure_data_dir():
     os.makedirs(DATA_DIR, exist_ok=True)
     if not os.path.exists(POOLS_META):
-        with open(POOLS_META, 'w', encoding='utf-8') as f:
-            json = __import__('json')
-            f.write(json.dumps([]))
+        write_json(POOLS_META, [])
+
+# Small JSON files read on almost every request (pools, users), validated by stat_key.
+# Callers get copies they may mutate; writers drop the entry.
+JSON_CACHE_SIZE = 1024
+_json_file_cache = StatCache(JSON_CACHE_SIZE)
+
+
+def _read_json_cached(path):
+    key = stat_key(path)
+    data = _json_file_cache.get(path, key)
+    if data is None:
+        # a missing file raises here, as before
+        data = read_json(path)
+        _json_file_cache.put(path, key, data)
+    return data
+
 
 def read_pools():
     ensure_data_dir()
-    import json as _json
     try:
         pools = []
-        # global pools
-        if os.path.exists(POOLS_META):
-            try:
-                with open(POOLS_META, 'r', encoding='utf-8') as f:
-                    pools = _json.load(f) or []
-            except Exception:
-                pools = []
+        # global pools (a missing file raises inside the try)
+        try:
+            pools = [dict(p) for p in (_read_json_cached(POOLS_META) or [])]
+        except Exception:
+            pools = []
         # user-specific pools override/append
         username = session.get('username')
         if username:
             upath = os.path.join(DATA_DIR, f"pools_{username}.json")
-            if os.path.exists(upath):
-                try:
-                    userp = _json.load(open(upath, 'r', encoding='utf-8')) or []
-                    # merge: user pools after global
-                    pools = pools + userp
-                except Exception:
-                    pass
+            try:
+                userp = [dict(p) for p in (_read_json_cached(upath) or [])]
+                # merge: user pools after global
+                pools = pools + userp
+            except Exception:
+                pass
         return pools
     except Exception:
         return []
@@ -56,82 +142,350 @@ def read_pools():
 
 def read_users():
     ensure_data_dir()
-    import json as _json
     try:
-        with open(USERS_FILE, 'r', encoding='utf-8') as f:
-            return _json.load(f)
+        return dict(_read_json_cached(USERS_FILE))
     except Exception:
         return {}
 
 
 def write_users(users):
     ensure_data_dir()
-    import json as _json
-    with open(USERS_FILE, 'w', encoding='utf-8') as f:
-        _json.dump(users, f, indent=2)
+    write_json(USERS_FILE, users, indent=False)
+    _json_file_cache.pop(USERS_FILE)
+    _invalidate_leaderboard()
 
 def write_pools(pools):
     ensure_data_dir()
-    import json as _json
     # If user signed in, write to their pools file; otherwise write global pools
     username = session.get('username')
     if username:
         upath = os.path.join(DATA_DIR, f"pools_{username}.json")
-        with open(upath, 'w', encoding='utf-8') as f:
-            _json.dump(pools, f, indent=2)
-    else:
-        with open(POOLS_META, 'w', encoding='utf-8') as f:
-            _json.dump(pools, f, indent=2)
-
-def compute_stats_for_pool(pool_meta):
-    # pool_meta: {id,path,orig_name}
-    # Support builtin pool (id == 'builtin') which uses the BUILTIN list
-    if pool_meta.get('id') == 'builtin':
-        qs = BUILTIN[:]
+        write_json(upath, pools, indent=False)
+        _json_file_cache.pop(upath)
     else:
-        qpath = pool_meta['path']
-        qs = load_questions(qpath)
-    qmap = {q.id: q for q in qs}
-    prog_fp = f"{DATA_DIR}/progress_{pool_meta['id']}.json"
+        write_json(POOLS_META, pools, indent=False)
+        _json_file_cache.pop(POOLS_META)
+
+# Independent file reads (per-user gamestates, per-pool summaries) are overlapped on a
+# small thread pool; workers must not touch the Flask request/session.
+IO_WORKERS = 8
+_io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix='io')
+
+
+def io_map(fn, items):
+    """list(map(fn, items)), run on the I/O pool when there is more than one item."""
+    items = list(items)
+    if len(items) < 2:
+        return [fn(x) for x in items]
+    return list(_io_pool.map(fn, items))
+
+
+# Parsed question banks, keyed by path and validated by stat_key
+QUESTIONS_CACHE_SIZE = 64
+_questions_cache = StatCache(QUESTIONS_CACHE_SIZE)
+
+
+def load_questions_cached(path):
+    """load_questions() with an in-memory cache. The list is shared: do not mutate it."""
+    if path is None:
+        return builtin()
+    key = stat_key(path)
+    if key is None:
+        return load_questions(path)
+    qs = _questions_cache.get(path, key)
+    if qs is not None:
+        return qs
+    # the sidecar is only written for uploaded banks: /start's `source` is a free-form
+    # path from the form and must stay read-only
+    qs = load_questions(path, cache=_in_data_dir(path))
+    _questions_cache.put(path, key, qs)
+    return qs
+
+
+def _in_data_dir(path):
+    data_dir = os.path.realpath(DATA_DIR)
+    try:
+        return os.path.commonpath([data_dir, os.path.realpath(path)]) == data_dir
+    except ValueError:
+        return False
+
+
+# Per-pool stats are cached in memory, keyed by the stat() of the files they are
+# computed from, so repeated page views skip re-reading unchanged pools.
+STATS_CACHE_SIZE = 256
+_stats_cache = OrderedDict()
+_stats_lock = threading.Lock()
+
+
+def _stat_keys(*paths):
+    return tuple(stat_key(p) for p in paths)
+
+
+def _cached_pool_value(kind, pool_meta, paths, compute):
+    """Return compute()'s value for this pool, recomputing only when one of `paths`
+    changed on disk or the value's expiry (a UTC ISO string, or None) has passed."""
+    ck = (kind, pool_meta.get('id'), pool_meta.get('path'))
+    key = _stat_keys(*paths)
+    with _stats_lock:
+        hit = _stats_cache.get(ck)
+        if hit and hit[0] == key and (hit[2] is None or utc_now_iso() < hit[2]):
+            _stats_cache.move_to_end(ck)
+            return hit[1]
+    value, expires = compute()
+    with _stats_lock:
+        _stats_cache[ck] = (key, value, expires)
+        _stats_cache.move_to_end(ck)
+        while len(_stats_cache) > STATS_CACHE_SIZE:
+            _stats_cache.popitem(last=False)
+    return value
+
+
+# Per-pool progress is kept in memory as the full merged {qid: state dict}, loaded on
+# first use and reloaded only if the file changes under us. /end merges into it and a
+# background flusher writes dirty pools at most every PROGRESS_FLUSH_INTERVAL seconds
+# (and at exit), so neither side re-reads the file to merge.
+PROGRESS_FLUSH_INTERVAL = 5.0
+_pool_progress = {}  # progress file path -> ((mtime_ns, size) or None, merged dict)
+_dirty_progress = set()  # progress file paths with changes not yet on disk
+_dirty_lock = threading.Lock()
+# held around each progress file write/delete; taken before _dirty_lock, never after
+_progress_write_lock = threading.Lock()
+_progress_gen = {}  # progress file path -> times discarded, to spot stale flush snapshots
+_flush_wakeup = threading.Event()
+# gamestate last_active stamps from /end, coalesced per user: uid -> ISO time
+_pending_last_active = {}
+
+
+def pool_progress_path(pool_id):
+    return f"{DATA_DIR}/progress_{pool_id}.json"
+
+
+def _pool_progress_locked(prog_fp):
+    # caller holds _dirty_lock
+    hit = _pool_progress.get(prog_fp)
+    if hit is not None and prog_fp in _dirty_progress:
+        return hit[1]
+    key = stat_key(prog_fp)
+    if hit is not None and hit[0] == key:
+        return hit[1]
     prog = {}
-    if os.path.exists(prog_fp):
+    if key is not None:
         try:
-            prog = __import__('json').load(open(prog_fp, 'r', encoding='utf-8'))
+            prog = read_json(prog_fp)
         except Exception:
             prog = {}
-    # compute stats
-    total = len(qs)
+    _pool_progress[prog_fp] = (key, prog)
+    return prog
+
+
+def read_pool_progress(prog_fp):
+    """Raw {qid: state dict} for a per-pool progress file, including unflushed updates.
+    The dict is a copy, but its values are shared: do not mutate them."""
+    with _dirty_lock:
+        return dict(_pool_progress_locked(prog_fp))
+
+
+def queue_pool_progress(pool_id, updates):
+    """Merge `updates` into the pool's progress; the flusher writes it to disk later."""
+    prog_fp = pool_progress_path(pool_id)
+    with _dirty_lock:
+        _pool_progress_locked(prog_fp).update(updates)
+        _dirty_progress.add(prog_fp)
+        _ensure_daemon('progress-flusher', _progress_flusher)
+    # cached summaries are keyed by the file's stat, which hasn't changed yet
+    with _stats_lock:
+        for ck in [ck for ck in _stats_cache if ck[1] == pool_id]:
+            del _stats_cache[ck]
+    _flush_wakeup.set()
+
+
+def queue_last_active(uid, ts):
+    """Stamp the user's gamestate last_active from the flusher instead of inline."""
+    with _dirty_lock:
+        _pending_last_active[uid] = ts
+        _ensure_daemon('progress-flusher', _progress_flusher)
+    _flush_wakeup.set()
+
+
+def discard_pool_progress(pool_id):
+    """Drop a pool's progress, pending updates included, and delete its file."""
+    prog_fp = pool_progress_path(pool_id)
+    # under _progress_write_lock so an in-flight flush can't write the file back
+    with _progress_write_lock:
+        with _dirty_lock:
+            _dirty_progress.discard(prog_fp)
+            _pool_progress.pop(prog_fp, None)
+            _progress_gen[prog_fp] = _progress_gen.get(prog_fp, 0) + 1
+        try:
+            os.remove(prog_fp)
+        except FileNotFoundError:
+            pass
+
+
+def flush_pool_progress():
+    """Write every dirty per-pool progress dict to disk."""
+    with _dirty_lock:
+        batch = {fp: (_progress_gen.get(fp, 0), dict(_pool_progress[fp][1])) for fp in _dirty_progress}
+        _dirty_progress.clear()
+    for prog_fp, (gen, prog) in batch.items():
+        with _progress_write_lock:
+            with _dirty_lock:
+                # discarded (pool deleted) since the snapshot: don't recreate the file
+                if _progress_gen.get(prog_fp, 0) != gen:
+                    continue
+            try:
+                ensure_data_dir()
+                # machine-read only: compact output
+                key = write_json(prog_fp, prog, indent=app.debug, fsync=True)
+            except Exception:
+                with _dirty_lock:
+                    _dirty_progress.add(prog_fp)
+                continue
+            with _dirty_lock:
+                hit = _pool_progress.get(prog_fp)
+                if hit is not None:
+                    # remember the file we just wrote so it isn't reloaded
+                    _pool_progress[prog_fp] = (key, hit[1])
+
+
+def flush_last_active():
+    with _dirty_lock:
+        batch = dict(_pending_last_active)
+        _pending_last_active.clear()
+    for uid, ts in batch.items():
+        try:
+            gs = load_gamestate(uid)
+            # a request may have stamped a newer time (e.g. a new day's streak update)
+            # since this was queued; never move last_active backwards
+            if ts > (gs.get('last_active') or ''):
+                gs['last_active'] = ts
+                save_gamestate(gs, uid)
+        except Exception:
+            pass
+
+
+def flush_pending():
+    flush_pool_progress()
+    flush_last_active()
+
+
+def _progress_flusher():
+    while True:
+        _flush_wakeup.wait()
+        time.sleep(PROGRESS_FLUSH_INTERVAL)
+        _flush_wakeup.clear()
+        flush_pending()
+
+
+def _flush_on_sigterm(signum, frame):
+    flush_pending()
+    raise SystemExit(128 + signum)
+
+
+atexit.register(flush_pending)
+# Only take over SIGTERM when nobody else has (e.g. the dev server); gunicorn installs
+# its own handler and exits through sys.exit, which runs the atexit hook above.
+try:
+    if signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+        signal.signal(signal.SIGTERM, _flush_on_sigterm)
+except ValueError:
+    # not the main thread
+    pass
+
+
+def compute_pool_summary(pool_meta):
+    """Return {'stats': {...}, 'times': {'labels', 'values'}} for a pool."""
+    prog_fp = pool_progress_path(pool_meta['id'])
+    paths = [prog_fp] if pool_meta.get('id') == 'builtin' else [prog_fp, pool_meta['path']]
+    return _cached_pool_value('summary', pool_meta, paths, lambda: _compute_pool_summary(pool_meta, prog_fp))
+
+
+def compute_pool_accuracy(pool_meta):
+    """Return {'correct', 'incorrect', 'accuracy'} for a pool, cached like the summary."""
+    if pool_meta.get('id') == 'builtin':
+        prog_fp = PROGRESS_FILE
+    else:
+        prog_fp = pool_progress_path(pool_meta['id'])
+    return _cached_pool_value('accuracy', pool_meta, [prog_fp], lambda: (_compute_pool_accuracy(prog_fp), None))
+
+
+def _compute_pool_accuracy(prog_fp):
+    # correct / incorrect counts and accuracy% from the progress file, in one pass
+    correct = incorrect = 0
+    try:
+        raw = read_pool_progress(prog_fp) if prog_fp != PROGRESS_FILE else read_json(prog_fp)
+        for v in raw.values():
+            correct += int(v.get('correct_streak', 0))
+            incorrect += int(v.get('incorrect_count', 0))
+    except Exception:
+        correct = incorrect = 0
+    denom = correct + incorrect
+    acc = int((correct * 100) / denom) if denom else 0
+    return {'correct': correct, 'incorrect': incorrect, 'accuracy': acc}
+
+
+def compute_stats_for_pool(pool_meta):
+    return compute_pool_summary(pool_meta)['stats']
+
+
+def _compute_pool_summary(pool_meta, prog_fp):
+    # pool_meta: {id,path,orig_name}
+    # One read of the progress file and one pass over its entries for both the stats
+    # and the timeseries. Returns (summary, next_due): due_count is only valid until
+    # the next card comes due.
+    # Support builtin pool (id == 'builtin') which uses the built-in list
+    qs = load_questions_cached(None if pool_meta.get('id') == 'builtin' else pool_meta['path'])
+    prog = read_pool_progress(prog_fp)
+    # stored due dates are naive UTC ISO strings, which order lexicographically
+    now_iso = utc_now_iso()
+    wrong_count = incorrect_total = box_sum = due_count = 0
+    next_due = None
+    # running maxima; ties keep the first entry, like max() did
+    mc_id = mw_id = None
+    mc_streak = mw_count = -1
+    per_day = {}
+    for qid, v in prog.items():
+        cs = v.get('correct_streak', 0)
+        ic = v.get('incorrect_count', 0)
+        if ic > 0:
+            wrong_count += 1
+        if cs > mc_streak:
+            mc_id, mc_streak = qid, cs
+        if ic > mw_count:
+            mw_id, mw_count = qid, ic
+        incorrect_total += ic
+        box_sum += v.get('box', 1)
+        d = v.get('due')
+        if d and isinstance(d, str):
+            if d <= now_iso:
+                due_count += 1
+            elif next_due is None or d < next_due:
+                next_due = d
+        last = v.get('last_seen')
+        if last:
+            day = last.split('T', 1)[0]
+            per_day[day] = per_day.get(day, 0) + 1
+
     answered = len(prog)
-    correct_streaks = {qid: v.get('correct_streak', 0) for qid, v in prog.items()}
-    incorrect_counts = {qid: v.get('incorrect_count', 0) for qid, v in prog.items()}
-    wrong_count = sum(1 for v in prog.values() if v.get('incorrect_count', 0) > 0)
     most_correct = None
     most_wrong = None
-    if correct_streaks:
-        mcid = max(correct_streaks, key=lambda k: correct_streaks[k])
-        most_correct = {'id': mcid, 'streak': correct_streaks[mcid], 'prompt': qmap.get(mcid).prompt if qmap.get(mcid) else ''}
-    if incorrect_counts:
-        mwid = max(incorrect_counts, key=lambda k: incorrect_counts[k])
-        most_wrong = {'id': mwid, 'count': incorrect_counts[mwid], 'prompt': qmap.get(mwid).prompt if qmap.get(mwid) else ''}
-    # additional metrics
-    incorrect_total = sum(v.get('incorrect_count', 0) for v in prog.values())
+    if answered:
+        qmap = {q.id: q for q in qs}
+        most_correct = {'id': mc_id, 'streak': mc_streak, 'prompt': qmap[mc_id].prompt if mc_id in qmap else ''}
+        most_wrong = {'id': mw_id, 'count': mw_count, 'prompt': qmap[mw_id].prompt if mw_id in qmap else ''}
     # average box (estimate of mastery)
-    boxes = [v.get('box', 1) for v in prog.values()]
-    avg_box = round((sum(boxes) / len(boxes)), 2) if boxes else 1.0
-    # due count
-    due_count = 0
-    for v in prog.values():
-        d = v.get('due')
-        if d:
-            try:
-                due_dt = datetime.fromisoformat(d)
-                if datetime.utcnow() >= due_dt:
-                    due_count += 1
-            except Exception:
-                pass
+    avg_box = round(box_sum / answered, 2) if answered else 1.0
+
+    # cumulative count of questions by the date they were last seen
+    labels = sorted(per_day)
+    values = []
+    total = 0
+    for d in labels:
+        total += per_day[d]
+        values.append(total)
 
-    return {
-        'total': total,
+    stats = {
+        'total': len(qs),
         'answered': answered,
         'wrong_count': wrong_count,
         'most_correct': most_correct,
@@ -140,40 +494,7 @@ def compute_stats_for_pool(pool_meta):
         'avg_box': avg_box,
         'due_count': due_count,
     }
-
-
-def compute_progress_timeseries(pool_meta):
-    # Build a simple cumulative timeseries of questions with a last_seen date
-    prog_fp = PROGRESS_FILE if pool_meta.get('id') == 'builtin' else f"{DATA_DIR}/progress_{pool_meta['id']}.json"
-    times = {}
-    if os.path.exists(prog_fp):
-        try:
-            import json as _json
-            raw = _json.load(open(prog_fp, 'r', encoding='utf-8'))
-            for qid, v in raw.items():
-                last = v.get('last_seen')
-                if not last:
-                    continue
-                try:
-                    d = last.split('T', 1)[0]
-                except Exception:
-                    d = last
-                times.setdefault(d, 0)
-                times[d] += 1
-        except Exception:
-            times = {}
-    # create sorted cumulative lists
-    if not times:
-        return {'labels': [], 'values': []}
-    dates = sorted(times.keys())
-    cum = []
-    total = 0
-    labels = []
-    for d in dates:
-        total += times[d]
-        labels.append(d)
-        cum.append(total)
-    return {'labels': labels, 'values': cum}
+    return {'stats': stats, 'times': {'labels': labels, 'values': values}}, next_due
 
 
 def _gamestate_path(user_id=None):
@@ -184,28 +505,51 @@ def _gamestate_path(user_id=None):
 
 
 def load_gamestate(user_id=None):
-    import json as _json
     fp = _gamestate_path(user_id)
-    if os.path.exists(fp):
+    # memoized per request: repeat loads for the same user share one dict, which
+    # callers mutate and hand back to save_gamestate
+    memo = g.setdefault('gamestates', {}) if has_request_context() else {}
+    gs = memo.get(fp)
+    if gs is None:
+        gs = memo[fp] = _read_gamestate_cached(fp)
+    return gs
+
+
+# Parsed gamestates are also kept across requests, keyed by path and checked against
+# the file's (mtime_ns, size); save_gamestate writes through and refreshes the entry.
+# Entries are shared, so a caller's changes are visible to the next load.
+GAMESTATE_CACHE_SIZE = 4096
+_gamestate_cache = StatCache(GAMESTATE_CACHE_SIZE)
+
+
+def _read_gamestate_cached(fp):
+    key = stat_key(fp)
+    gs = _gamestate_cache.get(fp, key)
+    if gs is None:
+        gs = _read_gamestate(fp)
+        # keyed by the stat taken before the read: a concurrent change just means a
+        # reload next time. A freshly written default (key None) isn't cached.
+        _gamestate_cache.put(fp, key, gs)
+    return gs
+
+
+def _read_gamestate(fp):
+    # just try the read: a missing file raises like a corrupt one and gets the default
+    try:
+        gs = read_json(fp)
+        # ensure numeric points and up-to-date rank
         try:
-            gs = _json.load(open(fp, 'r', encoding='utf-8'))
-            # ensure numeric points and up-to-date rank
-            try:
-                # coerce points to int when possible
-                if 'points' in gs:
-                    gs['points'] = int(gs.get('points', 0))
-            except Exception:
-                gs['points'] = 0
-            # recalc rank from points to keep consistency
-            check_and_award_badges(gs)
-            # persist any change
-            try:
-                _json.dump(gs, open(fp, 'w', encoding='utf-8'), indent=2)
-            except Exception:
-                pass
-            return gs
+            # coerce points to int when possible
+            if 'points' in gs:
+                gs['points'] = int(gs.get('points', 0))
         except Exception:
-            pass
+            gs['points'] = 0
+        # recalc rank from points to keep consistency (in memory only;
+        # save_gamestate persists it with the next real change)
+        check_and_award_badges(gs)
+        return gs
+    except Exception:
+        pass
     # default gamestate
     gs = {
         'points': 0,
@@ -216,23 +560,28 @@ def load_gamestate(user_id=None):
         'history': []
     }
     try:
-        _json.dump(gs, open(fp, 'w', encoding='utf-8'), indent=2)
+        write_json(fp, gs, indent=False)
     except Exception:
         pass
     return gs
 
 
 def save_gamestate(gs, user_id=None):
-    import json as _json
     fp = _gamestate_path(user_id)
+    if has_request_context():
+        g.setdefault('gamestates', {})[fp] = gs
     try:
-        _json.dump(gs, open(fp, 'w', encoding='utf-8'), indent=2)
+        key = write_json(fp, gs, indent=False)
     except Exception:
-        pass
+        _gamestate_cache.pop(fp)
+    else:
+        _gamestate_cache.put(fp, key, gs)
+    _invalidate_leaderboard()
 
 
 def update_daily_streak(gs):
-    # gs['last_active'] stores ISO datetime string; update daily_streak based on date change
+    # gs['last_active'] stores ISO datetime string; update daily_streak based on date change.
+    # Returns True when gs changed and needs saving.
     today = date.today()
     last = gs.get('last_active')
     if last:
@@ -245,22 +594,22 @@ def update_daily_streak(gs):
 
     if last_date == today:
         # already updated today
-        return gs
+        return False
     # if last active was yesterday, increment streak; otherwise reset to 1
     if last_date and (today - last_date).days == 1:
         gs['daily_streak'] = gs.get('daily_streak', 0) + 1
     else:
         gs['daily_streak'] = 1
-    gs['last_active'] = datetime.utcnow().isoformat(timespec='seconds')
+    gs['last_active'] = utc_now_iso()
     # check badges after streak update
     check_and_award_badges(gs)
-    return gs
+    return True
 
 
 def award_points(gs, amount, reason=None, user_id=None):
     # Record a points change in gamestate
     gs['points'] = gs.get('points', 0) + amount
-    rec = {'ts': datetime.utcnow().isoformat(timespec='seconds'), 'delta': amount, 'reason': reason}
+    rec = {'ts': utc_now_iso(), 'delta': amount, 'reason': reason}
     gs.setdefault('history', []).append(rec)
     check_and_award_badges(gs)
     save_gamestate(gs, user_id)
@@ -303,61 +652,106 @@ def current_user():
     return session.get('username')
 
 
+# Leaderboard points are cached briefly; save_gamestate/write_users invalidate early.
+LEADERBOARD_TTL = 5.0
+_leaderboard_cache = {'ts': 0.0, 'data': None, 'ranked': {}}
+
+# rank ordering used when the leaderboard is sorted by rank
+RANK_ORDER = {
+    'Grand Master': 6,
+    'Master': 5,
+    'Diamond': 4,
+    'Gold': 3,
+    'Silver': 2,
+    'Bronze': 1,
+    'Unranked': 0,
+}
+
+
+def _invalidate_leaderboard():
+    _leaderboard_cache['data'] = None
+    _leaderboard_cache['ranked'] = {}
+
+
+def _read_user_points(fp):
+    try:
+        data = read_json(fp)
+        return (int(data.get('points', 0)), data.get('rank', 'Unranked'))
+    except Exception:
+        return None
+
+
 def all_user_points():
-    """Return a dict username -> points by reading users.json and per-user gamestate files."""
+    """Return a dict username -> (points, rank) by reading users.json and per-user gamestate files."""
+    cached = _leaderboard_cache['data']
+    if cached is not None and time.monotonic() - _leaderboard_cache['ts'] < LEADERBOARD_TTL:
+        return cached
     users = read_users()
-    res = {}
-    import json as _json
-    for u in users.keys():
-        try:
-            gp = _gamestate_path(u)
-            if os.path.exists(gp):
-                data = _json.load(open(gp, 'r', encoding='utf-8'))
-                res[u] = (int(data.get('points', 0)), data.get('rank','Unranked'))
-            else:
-                res[u] = (0, 'Unranked')
-        except Exception:
-            res[u] = 0
+    # one directory listing instead of an exists() probe per user; guest
+    # (uuid) gamestates are skipped without being opened
+    files = {}
+    try:
+        with os.scandir(DATA_DIR) as it:
+            for e in it:
+                if e.name.startswith('gamestate_') and e.name.endswith('.json'):
+                    name = e.name[len('gamestate_'):-len('.json')]
+                    if name in users:
+                        files[name] = e.path
+    except OSError:
+        pass
+    res = {u: (0, 'Unranked') for u in users.keys()}
+    names = list(files)
+    for u, pr in zip(names, io_map(_read_user_points, [files[u] for u in names])):
+        if pr is not None:
+            res[u] = pr
+    _leaderboard_cache['ts'] = time.monotonic()
+    _leaderboard_cache['data'] = res
+    _leaderboard_cache['ranked'] = {}
     return res
 
 
-@app.route('/leaderboard')
-def leaderboard():
-    # compute leaderboard. support tabs: 'points' (default) or 'rank'
+def ranked_users(tab='points'):
+    """Return (sorted_users, place_by_user) for a leaderboard tab, memoized with the points cache."""
     pts = all_user_points()
+    ranked = _leaderboard_cache['ranked'].get(tab)
+    if ranked is not None and ranked[0] is pts:
+        return ranked[1], ranked[2]
     # pts: username -> (points, rank)
-    tab = request.args.get('tab', 'points')
-    # define rank ordering for sorting when tab='rank'
-    RANK_ORDER = {
-        'Grand Master': 6,
-        'Master': 5,
-        'Diamond': 4,
-        'Gold': 3,
-        'Silver': 2,
-        'Bronze': 1,
-        'Unranked': 0,
-    }
-
     if tab == 'rank':
         # sort primarily by rank value, then by points, then username
         sorted_users = sorted(pts.items(), key=lambda x: (-RANK_ORDER.get(x[1][1], 0), -x[1][0], x[0]))
     else:
         # default: sort by points
         sorted_users = sorted(pts.items(), key=lambda x: (-x[1][0], x[0]))
+    place_by_user = {u: i for i, (u, _) in enumerate(sorted_users, start=1)}
+    _leaderboard_cache['ranked'][tab] = (pts, sorted_users, place_by_user)
+    return sorted_users, place_by_user
 
+
+@app.route('/leaderboard')
+def leaderboard():
+    # compute leaderboard. support tabs: 'points' (default) or 'rank'
+    tab = request.args.get('tab', 'points')
+    if tab != 'rank':
+        tab = 'points'
+    sorted_users, place_by_user = ranked_users(tab)
     top10 = [(u, p[0], p[1]) for u, p in sorted_users[:10]]
     cur = current_user()
-    user_place = None
-    user_points = 0
-    if cur:
-        for i, (u, p) in enumerate(sorted_users, start=1):
-            if u == cur:
-                user_place = i
-                user_points = p[0]
-                break
+    user_place = place_by_user.get(cur) if cur else None
+    user_points = sorted_users[user_place - 1][1][0] if user_place else 0
     return render_template('leaderboard.html', top10=top10, user_place=user_place, user_points=user_points, current_user=cur, tab=tab)
 
 
+_PW_LOWER, _PW_UPPER, _PW_DIGIT, _PW_SPECIAL = 1, 2, 4, 8
+_PW_ALL = _PW_LOWER | _PW_UPPER | _PW_DIGIT | _PW_SPECIAL
+_PW_REASONS = (
+    (_PW_LOWER, 'a lowercase letter'),
+    (_PW_UPPER, 'an uppercase letter'),
+    (_PW_DIGIT, 'a digit'),
+    (_PW_SPECIAL, 'a special character (e.g. !@#$%)'),
+)
+
+
 def is_strong_password(pw: str) -> Tuple[bool, list]:
     """Return (True, []) if password is strong, otherwise (False, reasons list).
 
@@ -368,42 +762,60 @@ def is_strong_password(pw: str) -> Tuple[bool, list]:
     - at least one digit
     - at least one special character (non-alphanumeric)
     """
+    # one pass collecting character classes as bit flags, stopping once all are seen
+    has = 0
+    for c in pw:
+        if c.islower():
+            has |= _PW_LOWER
+        elif c.isupper():
+            has |= _PW_UPPER
+        # not elif: a few cased symbols (e.g. circled letters) count as special too
+        if c.isdigit():
+            has |= _PW_DIGIT
+        elif not c.isalnum():
+            has |= _PW_SPECIAL
+        if has == _PW_ALL:
+            break
     reasons = []
     if len(pw) < 8:
         reasons.append('at least 8 characters')
-    if not any(c.islower() for c in pw):
-        reasons.append('a lowercase letter')
-    if not any(c.isupper() for c in pw):
-        reasons.append('an uppercase letter')
-    if not any(c.isdigit() for c in pw):
-        reasons.append('a digit')
-    if not any(not c.isalnum() for c in pw):
-        reasons.append('a special character (e.g. !@#$%)')
+    if has != _PW_ALL:
+        reasons.extend(msg for bit, msg in _PW_REASONS if not has & bit)
     return (len(reasons) == 0, reasons)
 
 
+# Points per answer double with each consecutive correct (10, 20, 40, ...) or wrong
+# (-2, -4, -8, ...) answer; the doubling stops after STREAK_CAP steps. At 30 the largest
+# delta is 10 << 30 (~1.07e10), so point totals stay within 64-bit JSON integers for
+# hundreds of millions of answers.
+STREAK_CAP = 30
+_CORRECT_DELTA = tuple(10 << n for n in range(STREAK_CAP + 1))
+_WRONG_DELTA = tuple(-(2 << n) for n in range(STREAK_CAP + 1))
+
+
+# read-only stand-in for cards with no progress yet; never mutated or stored
+_UNSEEN_STATE = CardState()
+
+
 def choose_special_set(qs, n, prog):
     # choose questions most in need: use incorrect_count and low box as signals
-    scored = []
-    for q in qs:
-        st = prog.get(q.id, CardState())
-        score = st.incorrect_count * 3 + (6 - st.box)
+    now_ts = datetime.utcnow().timestamp()
+
+    def score(q):
+        st = prog.get(q.id, _UNSEEN_STATE)
+        s = st.incorrect_count * 3 + (6 - st.box)
         # overdue bonus
-        if st.due:
-            try:
-                from datetime import datetime
-                due = datetime.fromisoformat(st.due)
-                if datetime.utcnow() >= due:
-                    score += 2
-            except Exception:
-                pass
-        scored.append((score, q))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    chosen = [q for _, q in scored[:min(n, len(scored))]]
+        if st._due_ts and now_ts >= st._due_ts:
+            s += 2
+        return s
+
+    # top-n only (ties keep pool order, as the full stable sort did)
+    chosen = heapq.nlargest(n, qs, key=score)
     # if not enough high-score items, fill with srs-weighted selection
     if len(chosen) < n:
         needed = n - len(chosen)
-        remaining = [q for q in qs if q not in chosen]
+        chosen_ids = {q.id for q in chosen}
+        remaining = [q for q in qs if q.id not in chosen_ids]
         chosen += choose_exam_set(remaining, needed, prog)
     return chosen
 
@@ -417,30 +829,20 @@ def index():
     builtin_meta = {'id': 'builtin', 'path': None, 'orig_name': 'Built-in pool'}
     pools_display = [builtin_meta] + pools
     stats = []
-    for p in pools_display:
-        s = compute_stats_for_pool(p)
-        t = compute_progress_timeseries(p)
-        stats.append({'meta': p, 'stats': s, 'times': t})
+    for p, summary in zip(pools_display, io_map(compute_pool_summary, pools_display)):
+        stats.append({'meta': p, 'stats': summary['stats'], 'times': summary['times']})
     uid = get_user_id()
     user = current_user()
     gs = load_gamestate(user or uid)
     # update daily streak on each visit
-    gs = update_daily_streak(gs)
-    save_gamestate(gs, user or uid)
+    if update_daily_streak(gs):
+        save_gamestate(gs, user or uid)
     # prepare leaderboard summary for embedding on the main page
-    pts = all_user_points()
-    # pts: username -> (points, rank)
-    sorted_users = sorted(pts.items(), key=lambda x: (-x[1][0], x[0]))
+    sorted_users, place_by_user = ranked_users('points')
     # sorted_users: list of (username, (points, rank))
     top10 = [(u, v[0], v[1]) for u, v in sorted_users[:10]]
-    user_place = None
-    user_points = 0
-    if user:
-        for i, (u, p) in enumerate(sorted_users, start=1):
-            if u == user:
-                user_place = i
-                user_points = p[0]
-                break
+    user_place = place_by_user.get(user) if user else None
+    user_points = sorted_users[user_place - 1][1][0] if user_place else 0
     leaderboard = {'top10': top10, 'user_place': user_place, 'user_points': user_points}
     return render_template('index.html', pools=stats, points=gs.get('points',0), daily_streak=gs.get('daily_streak', 0), rank=gs.get('rank','Unranked'), current_user=user, leaderboard=leaderboard)
 
@@ -471,37 +873,47 @@ def start():
     ch = request.form.get('chapters')
     tg = request.form.get('tags')
 
-    all_qs = load_questions(src)
+    all_qs = load_questions_cached(src)
     chapters = parse_chapter_filter(ch)
     tags = [t.strip().lower() for t in tg.split(',') if t.strip()] if tg else None
     pool = filter_questions(all_qs, chapters, tags)
     if not pool:
         return "No questions in pool. Go <a href='/'>back</a>."
+    prog = load_progress(PROGRESS_FILE)
     sid = uuid.uuid4().hex
     app_state[sid] = {
-        'pool': [q.__dict__ for q in pool],
+        # the pool is kept as (source, ids); Question objects come from the shared cache
+        'pool_src': src,
+        'pool_ids': tuple(q.id for q in pool),
         'num': num,
         'index': 0,
-        'set': [q.__dict__ for q in choose_exam_set(pool, num, load_progress(PROGRESS_FILE))],
+        'set': [q.to_dict() for q in choose_exam_set(pool, num, prog)],
         'wrong': [],
-        'progress': {k: v.__dict__ for k,v in load_progress(PROGRESS_FILE).items()},
+        'progress': dict(prog),
     }
     session['sid'] = sid
     return redirect(url_for('question'))
 
+def session_pool(state):
+    """Resolve a session's pool ids back to Question objects from the cached bank."""
+    ids = set(state.get('pool_ids', ()))
+    return [q for q in load_questions_cached(state.get('pool_src')) if q.id in ids]
+
+
 @app.route('/pool')
 def pool_preview():
     sid = session.get('sid')
     # If there is an active session, use its pool. Otherwise allow preview via query params
-    if sid and sid in app_state:
-        pool = app_state[sid]['pool']
+    state = app_state.get(sid) if sid else None
+    if state is not None:
+        pool = session_pool(state)
         return render_template('pool.html', qs=pool, count=len(pool))
 
     # No session: build pool from optional GET args (or default built-in pool)
     src = request.args.get('source') or None
     ch = request.args.get('chapters')
     tg = request.args.get('tags')
-    all_qs = load_questions(src)
+    all_qs = load_questions_cached(src)
     chapters = parse_chapter_filter(ch)
     tags = [t.strip().lower() for t in tg.split(',') if t.strip()] if tg else None
     pool = filter_questions(all_qs, chapters, tags)
@@ -534,12 +946,18 @@ def pools():
         return redirect(url_for('pools'))
     # GET
     stats = []
-    for p in pools_display:
-        s = compute_stats_for_pool(p)
+    for p, s in zip(pools_display, io_map(compute_stats_for_pool, pools_display)):
         stats.append({'meta': p, 'stats': s})
     return render_template('pools.html', pools=stats, current_user=current_user())
 
 
+def _remove_if_exists(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
 @app.route('/pools/<pid>/delete', methods=['POST'])
 def pools_delete(pid):
     # remove pool metadata, delete uploaded file and per-pool progress
@@ -550,15 +968,15 @@ def pools_delete(pid):
     # delete file if it exists and looks like an uploaded file
     try:
         fp = meta.get('path')
-        if fp and os.path.exists(fp):
-            os.remove(fp)
+        if fp:
+            _remove_if_exists(fp)
+            _remove_if_exists(fp + QCACHE_SUFFIX)
+        _questions_cache.pop(fp)
     except Exception:
         pass
     # delete per-pool progress file
     try:
-        prog_fp = f"{DATA_DIR}/progress_{pid}.json"
-        if os.path.exists(prog_fp):
-            os.remove(prog_fp)
+        discard_pool_progress(pid)
     except Exception:
         pass
     # remove from pools list
@@ -610,8 +1028,9 @@ def signup():
             try:
                 gp = _gamestate_path(guest_id)
                 up = _gamestate_path(username)
-                if os.path.exists(gp) and not os.path.exists(up):
-                    open(up, 'wb').write(open(gp, 'rb').read())
+                # a missing guest file raises and is ignored below
+                if not os.path.exists(up):
+                    shutil.copyfile(gp, up)
             except Exception:
                 pass
         session['username'] = username
@@ -641,8 +1060,9 @@ def login():
             try:
                 gp = _gamestate_path(guest_id)
                 up = _gamestate_path(username)
-                if os.path.exists(gp) and not os.path.exists(up):
-                    open(up, 'wb').write(open(gp, 'rb').read())
+                # a missing guest file raises and is ignored below
+                if not os.path.exists(up):
+                    shutil.copyfile(gp, up)
             except Exception:
                 pass
         session['username'] = username
@@ -677,30 +1097,27 @@ def pools_special(pid):
         return redirect(url_for('pools'))
     # load questions and per-pool progress
     if meta.get('id') == 'builtin':
-        qs = load_questions(None)
+        qs = load_questions_cached(None)
         prog = load_progress(PROGRESS_FILE)
     else:
-        qs = load_questions(meta['path'])
-        prog = {}
-        prog_fp = f"{DATA_DIR}/progress_{meta['id']}.json"
-        if os.path.exists(prog_fp):
-            try:
-                import json as _json
-                raw = _json.load(open(prog_fp, 'r', encoding='utf-8'))
-                prog = {k: CardState(**v) for k,v in raw.items()}
-            except Exception:
-                prog = {}
+        qs = load_questions_cached(meta['path'])
+        try:
+            raw = read_pool_progress(pool_progress_path(meta['id']))
+            prog = {k: CardState(**v) for k, v in raw.items()}
+        except Exception:
+            prog = {}
     sid = uuid.uuid4().hex
     app_state[sid] = {
-        'pool': [q.__dict__ for q in qs],
+        'pool_src': meta.get('path'),
+        'pool_ids': tuple(q.id for q in qs),
         'num': 10,
         'index': 0,
-        'set': [q.__dict__ for q in choose_special_set(qs, 10, prog)],
+        'set': [q.to_dict() for q in choose_special_set(qs, 10, prog)],
         'wrong': [],
-        'progress': {k: v.__dict__ for k, v in prog.items()},
+        'progress': dict(prog),
+        'pool_id': pid,
     }
     session['sid'] = sid
-    session['pool_id'] = pid
     return redirect(url_for('question'))
 
 
@@ -717,37 +1134,34 @@ def pools_start(pid):
         num = int(request.form.get('num') or 10)
         # load questions for builtin vs uploaded
         if meta.get('id') == 'builtin':
-            pool = BUILTIN[:]
+            pool = load_questions_cached(None)
         else:
-            all_qs = load_questions(meta['path'])
-            pool = all_qs
+            pool = load_questions_cached(meta['path'])
         # load per-pool progress if available (so choose_exam_set uses it)
         prog = {}
         if meta.get('id') == 'builtin':
             # fall back to global progress file for builtin
             prog = load_progress(PROGRESS_FILE)
         else:
-            prog_fp = f"{DATA_DIR}/progress_{meta['id']}.json"
-            if os.path.exists(prog_fp):
-                try:
-                    import json as _json
-                    raw = _json.load(open(prog_fp, 'r', encoding='utf-8'))
-                    prog = {k: CardState(**v) for k, v in raw.items()}
-                except Exception:
-                    prog = {}
+            try:
+                raw = read_pool_progress(pool_progress_path(meta['id']))
+                prog = {k: CardState(**v) for k, v in raw.items()}
+            except Exception:
+                prog = {}
 
         sid = uuid.uuid4().hex
         app_state[sid] = {
-            'pool': [q.__dict__ for q in pool],
+            'pool_src': meta.get('path'),
+            'pool_ids': tuple(q.id for q in pool),
             'num': num,
             'index': 0,
-            'set': [q.__dict__ for q in choose_exam_set(pool, num, prog)],
+            'set': [q.to_dict() for q in choose_exam_set(pool, num, prog)],
             'wrong': [],
-            'progress': {k: v.__dict__ for k, v in prog.items()},
+            'progress': dict(prog),
+            # current pool id, for saving progress to the per-pool file
+            'pool_id': pid,
         }
         session['sid'] = sid
-        # remember current pool id for saving progress to per-pool file
-        session['pool_id'] = pid
         return redirect(url_for('question'))
     return render_template('pools_start.html', meta=meta, current_user=current_user())
 
@@ -762,36 +1176,23 @@ def pools_stats(pid):
         meta = next((p for p in pools if p['id']==pid), None)
         if not meta:
             return redirect(url_for('pools'))
-    stats = compute_stats_for_pool(meta)
-    times = compute_progress_timeseries(meta)
+    summary = compute_pool_summary(meta)
+    stats, times = summary['stats'], summary['times']
     uid = get_user_id()
     gs = load_gamestate(uid)
     # update daily streak when viewing stats
-    gs = update_daily_streak(gs)
-    save_gamestate(gs, uid)
-    # build extra summary: correct / incorrect counts and accuracy% from per-pool progress
-    extra = {'correct': 0, 'incorrect': 0, 'accuracy': 0}
-    prog_fp = PROGRESS_FILE if meta.get('id') == 'builtin' else f"{DATA_DIR}/progress_{meta['id']}.json"
-    if os.path.exists(prog_fp):
-        try:
-            import json as _json
-            raw = _json.load(open(prog_fp, 'r', encoding='utf-8'))
-            correct = sum(int(v.get('correct_streak', 0)) for v in raw.values())
-            incorrect = sum(int(v.get('incorrect_count', 0)) for v in raw.values())
-            denom = correct + incorrect
-            acc = int((correct * 100) / denom) if denom else 0
-            extra = {'correct': correct, 'incorrect': incorrect, 'accuracy': acc}
-        except Exception:
-            extra = {'correct': 0, 'incorrect': 0, 'accuracy': 0}
-
+    if update_daily_streak(gs):
+        save_gamestate(gs, uid)
+    extra = compute_pool_accuracy(meta)
     return render_template('pool_stats.html', meta=meta, stats=stats, times=times, extra=extra, points=gs.get('points',0), rank=gs.get('rank','Unranked'), daily_streak=gs.get('daily_streak', 0), current_user=current_user())
 
 @app.route('/question', methods=['GET', 'POST'])
 def question():
     sid = session.get('sid')
-    if not sid or sid not in app_state:
+    # one lookup: an expired or unknown session goes straight home, for GET and POST
+    state = app_state.get(sid) if sid else None
+    if state is None:
         return redirect(url_for('index'))
-    state = app_state[sid]
     s = state['set']
     idx = state.get('index', 0)
     if idx >= len(s):
@@ -804,110 +1205,85 @@ def question():
         return "Session complete. <a href='/end'>End and Save</a>"
 
     qd = s[idx]
-    # convert dict back to simple object-like for template
-    class Q:
-        def __init__(self, **kwargs):
-            self.__dict__.update(kwargs)
-    q = Q(**qd)
+    # attribute access for the template
+    q = SimpleNamespace(**qd)
     if request.method == 'POST':
         # Handle answer submission
         choice = request.form.get('choice')
-        prog_raw = state.get('progress', {})
-        # restore CardState objects
-        prog = {k: CardState(**v) for k, v in prog_raw.items()}
+        # live CardState objects; serialized only when /end persists them
+        prog = state.setdefault('progress', {})
         ok = (choice == getattr(q, 'answer', None))
-        st = prog.get(getattr(q, 'id', None), CardState())
+        st = prog.get(getattr(q, 'id', None))
+        if st is None:
+            st = CardState()
         if ok:
             st.promote()
         else:
             st.demote()
             # append to wrong list for later review
-            state.setdefault('wrong', []).append(q.__dict__)
+            state.setdefault('wrong', []).append(qd)
         # persist progress and advance index
         if getattr(q, 'id', None) is not None:
             prog[q.id] = st
-        state['progress'] = {k: v.__dict__ for k, v in prog.items()}
         state['index'] = idx + 1
 
         # gamification: award points (per-user) after answering
         user = current_user()
         uid = user or get_user_id()
         gs = load_gamestate(uid)
-        # ensure daily streak is current for this activity
-        gs = update_daily_streak(gs)
+        # ensure daily streak is current for this activity (saved by award_points below)
+        update_daily_streak(gs)
 
         # implement streak-based doubling
         streak = gs.get('answer_streak', 0) or 0
         if ok:
             if streak < 0:
                 streak = 0
-            delta = 10 * (2 ** streak)
+            delta = _CORRECT_DELTA[min(streak, STREAK_CAP)]
             streak = streak + 1
             reason = 'correct'
         else:
             if streak > 0:
                 streak = 0
             # wrong penalty doubles on consecutive wrongs
-            delta = - (2 * (2 ** abs(streak))) if streak < 0 else -2
+            delta = _WRONG_DELTA[min(-streak, STREAK_CAP)]
             streak = streak - 1
             reason = 'incorrect'
         gs['answer_streak'] = streak
         award_points(gs, delta, reason, user_id=uid)
 
         # Render the result page for POST
-        return render_template('result.html', ok=ok, q=q, points_delta=delta, points=gs.get('points', 0), rank=gs.get('rank', 'Unranked'), daily_streak=gs.get('daily_streak', 0), current_user=current_user())
+        return render_template('result.html', ok=ok, q=q, points_delta=delta, points=gs.get('points', 0), rank=gs.get('rank', 'Unranked'))
 
     # GET: build letter-option pairs for template
-    letters = ['A', 'B', 'C', 'D']
-    pairs = list(zip(letters, getattr(q, 'options', [])))
+    pairs = tuple(zip(LETTERS, qd.get('options', ())))
     # load points for signed-in user if available
     user = current_user()
     pts = load_gamestate(user or get_user_id()).get('points', 0)
-    return render_template('question.html', q=q, pairs=pairs, pool_name=session.get('pool_id'), points=pts, current_user=user)
+    return render_template('question.html', q=q, pairs=pairs, pool_name=state.get('pool_id'), points=pts, current_user=user)
 
 @app.route('/end')
 def end():
     # persist progress
-    sid = session.get('sid')
-    if sid and sid in app_state:
-        state = app_state.pop(sid)
-        prog = {k: CardState(**v) for k, v in state.get('progress', {}).items()}
+    # the only session write here: an expired sid is dropped too, and pop() leaves
+    # the cookie untouched when there is no sid at all
+    sid = session.pop('sid', None)
+    state = app_state.pop(sid, None) if sid else None
+    if state is not None:
+        prog = state.get('progress', {})
         # save global progress file (for legacy/global usage)
         save_progress(PROGRESS_FILE, prog)
         # also save per-pool progress if this session came from a specific pool
-        pool_id = session.get('pool_id')
+        pool_id = state.get('pool_id')
         if pool_id:
-            ensure_data_dir()
-            prog_fp = f"{DATA_DIR}/progress_{pool_id}.json"
-            try:
-                import json as _json
-                existing = {}
-                if os.path.exists(prog_fp):
-                    try:
-                        existing = _json.load(open(prog_fp, 'r', encoding='utf-8'))
-                    except Exception:
-                        existing = {}
-                # merge/overwrite with latest progress
-                new_prog = {k: v.__dict__ for k, v in prog.items()}
-                existing.update(new_prog)
-                with open(prog_fp, 'w', encoding='utf-8') as f:
-                    _json.dump(existing, f, indent=2)
-            except Exception:
-                pass
-
-        log_event(LOG_FILE, {"mode": "web", "count_pool": len(state.get('pool', []))})
-        # update last_active for gamestate on session end
-        try:
-            uid = session.get('user_id')
-            if uid:
-                gs = load_gamestate(uid)
-                gs['last_active'] = datetime.utcnow().isoformat(timespec='seconds')
-                save_gamestate(gs, uid)
-        except Exception:
-            pass
-        # clear session pool id
-        session.pop('pool_id', None)
-        session.pop('sid', None)
+            # merged into the pool's progress file by the background flusher
+            queue_pool_progress(pool_id, {k: v.to_dict() for k, v in prog.items()})
+
+        log_event(LOG_FILE, {"mode": "web", "count_pool": len(state.get('pool_ids', ()))})
+        # update last_active for gamestate on session end (written by the flusher)
+        uid = session.get('user_id')
+        if uid:
+            queue_last_active(uid, utc_now_iso())
     return "Saved progress. <a href='/'>Back to home</a>"
 
 if __name__ == '__main__':
@@ -1,7 +1,5 @@
 from webgui import app
 
 # WSGI entrypoint for gunicorn or other WSGI servers
-# Example: gunicorn wsgi:app -b 0.0.0.0:8000
-
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8000)
+# Example: gunicorn -c gunicorn.conf.py wsgi:app
+# (for local development use app.py, which runs Flask's dev server)